@@ -5,4 +5,12 @@ port1 = 8980
 port2 = 10080
 volume = 60.0
 # host = "192.168.19.12"
-host = "127.0.0.1"
\ No newline at end of file
+host = "127.0.0.1"
+# 播放列表预读，单位：字节
+prefetch = True
+prefetch_files = 2
+prefetch_head = 16 * 1024 * 1024
+prefetch_ahead = 64 * 1024 * 1024
+prefetch_budget = 128 * 1024 * 1024
+# 播放位置轮询间隔，单位：毫秒
+prefetch_interval = 1000
\ No newline at end of file
@@ -253,9 +253,9 @@ class Player(object):
         else:
             return False
 
-    def _run_command(self, name, *args):
+    def _send_command(self, name, *args):
         if not self.is_alive():
-            return
+            return False
         cmd = [self.cmd_prefix, name]
         cmd.extend(args)
         cmd.append('\n')
@@ -267,12 +267,24 @@ class Player(object):
         except (TypeError, UnicodeEncodeError):
             self._proc.stdin.write(cmd.encode('utf-8', 'ignore'))
         self._proc.stdin.flush()
-        if name == 'get_property' and self._proc.stdout is not None:
+        return True
+
+    def _run_command(self, name, *args):
+        wait = (name == 'get_property' and self.is_alive() and
+                self._proc.stdout is not None)
+        if wait:
+            self._stdout._expect(args[0])
+        if not self._send_command(name, *args):
+            if wait:
+                self._stdout._unexpect(args[0])
+            return
+        if wait:
             key = 'ANS_{0}='.format(args[0])
             while True:
                 try:
                     res = self._stdout._answers.get(timeout=1.0)
                 except queue.Empty:
+                    self._stdout._unexpect(args[0])
                     return
                 if res.startswith(key):
                     break
@@ -7,6 +7,7 @@ import misc
 from PyQt5.QtCore import Qt, pyqtSignal,QMutex
 from PyQt5.QtGui import QKeyEvent, QIcon
 import config
+from prefetch import ReadAhead
 from PyQt5.QtNetwork import QUdpSocket, QHostAddress,QAbstractSocket
 import argparse
 import sys
@@ -17,14 +18,74 @@ __all__ = ['QtPlayer', 'QPlayerView']
 
 
 class QtPlayer(Player):
+    # stream_pos 请求超过这么多次轮询仍未应答即视为丢失
+    position_timeout = 5
 
     def __init__(self, args=(), stdout=PIPE, stderr=None, autospawn=True):
         super(QtPlayer, self).__init__(args, autospawn=False)
         self._stdout = _StdoutWrapper(handle=stdout)
         self._stderr = _StderrWrapper(handle=stderr)
+        self._readahead = None
+        self._position_ticks = 0
+        if config.prefetch:
+            self._readahead = ReadAhead(config.prefetch_files, config.prefetch_head,
+                                        config.prefetch_ahead, config.prefetch_budget,
+                                        loop='-loop' in self._args)
+            self._stdout.connect(self._readahead.feed)
         if autospawn:
             self.spawn()
 
+    @property
+    def readahead(self):
+        return self._readahead
+
+    def spawn(self):
+        super(QtPlayer, self).spawn()
+        if self._readahead is not None and self.is_alive():
+            self._readahead.start()
+
+    def quit(self, retcode=0):
+        if self._readahead is not None:
+            self._readahead.stop()
+        return super(QtPlayer, self).quit(retcode)
+
+    def poll_position(self):
+        # 上一次请求尚未应答时不重复发送，超时后丢弃重发
+        if ('stream_pos', self._on_stream_pos) in self._stdout._expected:
+            self._position_ticks += 1
+            if self._position_ticks < self.position_timeout:
+                return
+            self._stdout._unexpect('stream_pos', self._on_stream_pos)
+        self._position_ticks = 0
+        self._stdout._expect('stream_pos', self._on_stream_pos)
+        # 不等待应答：stdout 由主线程的 QSocketNotifier 读取
+        if not self._send_command('get_property', 'stream_pos'):
+            self._stdout._unexpect('stream_pos', self._on_stream_pos)
+
+    def _on_stream_pos(self, ans):
+        try:
+            self._readahead.position(int(ans))
+        except (TypeError, ValueError):
+            pass
+
+    def loadfile(self, path, append=None):
+        res = super(QtPlayer, self).loadfile(path, append)
+        if self._readahead is not None and self.is_alive():
+            self._readahead.loadfile(path, bool(append))
+        return res
+
+    def loadlist(self, path, append=None):
+        res = super(QtPlayer, self).loadlist(path, append)
+        if self._readahead is not None and self.is_alive():
+            self._readahead.loadlist(path, bool(append))
+        return res
+
+    def pt_step(self, step, force=None):
+        res = super(QtPlayer, self).pt_step(step, force)
+        if self._readahead is not None and self.is_alive():
+            self._readahead.pt_step(step, bool(force))
+        return res
+
 
 class QPlayerView(_Container):
     eof = pyqtSignal(int)
@@ -43,6 +104,10 @@ class QPlayerView(_Container):
 
         self.tray_wid()
         self.qmutex = QMutex()
+        if self._player.readahead is not None:
+            self.readahead_timer = QtCore.QTimer(self)
+            self.readahead_timer.timeout.connect(self.on_readahead_timer)
+            self.readahead_timer.start(int(config.prefetch_interval))
         if udp:
             self.udp_slave(int(config.port1), int(config.port2))
 
@@ -109,6 +174,12 @@ class QPlayerView(_Container):
         elif ddata == "FT1":
             self._player.loadlist(config.list_dir)
 
+    def on_readahead_timer(self):
+        self._player.poll_position()
+        stats = self._player.readahead.stats()
+        self.tray.setToolTip(u'预读 命中: {0} 未命中: {1} 已预读: {2:.1f} MB'.format(
+            stats['hits'], stats['misses'], stats['bytes_prefetched'] / 1048576.0))
+
     def tray_wid(self):
         self.tray = QSystemTrayIcon()
         self.icon = QIcon('gy.ico')
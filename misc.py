@@ -1,3 +1,5 @@
+from threading import Lock
+
 try:
     import queue
 except ImportError:
@@ -58,17 +60,55 @@ class _StdoutWrapper(_StderrWrapper):
     def __init__(self, **kwargs):
         super(_StdoutWrapper, self).__init__(**kwargs)
         self._answers = None
+        self._expected = []
+        self._lock = Lock()
 
     def _attach(self, source):
         super(_StdoutWrapper, self)._attach(source)
         self._answers = queue.Queue()
+        with self._lock:
+            self._expected = []
+
+    def _expect(self, pname, callback=None):
+        # 按发送顺序记录未应答的 get_property；
+        # callback 为 None 时应答进入 _answers，否则交给 callback
+        with self._lock:
+            self._expected.append((pname, callback))
+
+    def _unexpect(self, pname, callback=None):
+        with self._lock:
+            if (pname, callback) in self._expected:
+                self._expected.remove((pname, callback))
+
+    def _dispatch_answer(self, line):
+        key, _, ans = line.partition('=')
+        entry = None
+        with self._lock:
+            if key == 'ANS_ERROR':
+                # 应答按请求顺序返回，错误属于最早的未应答请求
+                if self._expected:
+                    entry = self._expected.pop(0)
+            else:
+                for i, (pname, callback) in enumerate(self._expected):
+                    if key == 'ANS_{0}'.format(pname):
+                        entry = self._expected[i]
+                        # 排在前面的请求已丢失应答
+                        del self._expected[:i + 1]
+                        break
+        if entry is None or entry[1] is None:
+            self._answers.put_nowait(line)
+            return
+        ans = ans.strip('\'"')
+        if key == 'ANS_ERROR' or ans == '(null)':
+            ans = None
+        entry[1](ans)
 
     def _process_output(self, *args):
         line = self._source.readline().decode('utf-8', 'ignore')
         if line:
             line = line.rstrip()
             if line.startswith('ANS_'):
-                self._answers.put_nowait(line)
+                self._dispatch_answer(line)
             elif line:
                 for subscriber in self._subscribers:
                     subscriber(line)
@@ -0,0 +1,255 @@
+import os
+from threading import Thread, Lock, Event
+
+__all__ = ['ReadAhead']
+
+MB = 1024 * 1024
+
+
+class ReadAhead(object):
+    """
+    按播放列表位置预读媒体文件到系统页缓存：
+    当前文件播放位置之后的 ahead 字节，以及后续 files 个文件的前 head 字节，
+    总量不超过 budget。
+
+    命中/未命中只在播放位置落到新位置时统计：进入一个文件，或跳转（后退，
+    或越过已预读范围）。命中表示该位置此前已提交预读，不代表页面仍在缓存中。
+    """
+
+    def __init__(self, files=2, head=16 * MB, ahead=64 * MB, budget=128 * MB,
+                 loop=False, chunk=4 * MB):
+        super(ReadAhead, self).__init__()
+        self.files = files
+        self.head = head
+        self.ahead = ahead
+        self.budget = budget
+        self.loop = loop
+        self.chunk = chunk
+        self.hits = 0
+        self.misses = 0
+        self.bytes_prefetched = 0
+        self._entries = []
+        self._index = 0
+        self._pos = 0
+        self._step_pending = None
+        self._warm = {}
+        self._sizes = {}
+        self._lock = Lock()
+        self._wake = Event()
+        self._stopping = None
+        self._buffer = None
+
+    def __repr__(self):
+        return '<{0} hits={1} misses={2} bytes_prefetched={3}>'.format(
+            self.__class__.__name__, self.hits, self.misses, self.bytes_prefetched)
+
+    def start(self):
+        if self._stopping is not None and not self._stopping.is_set():
+            return
+        # 每个工作线程有自己的停止标志，旧线程退出前不会与新线程混淆
+        self._stopping = Event()
+        t = Thread(target=self._thread_func, args=(self._stopping,))
+        t.daemon = True
+        t.start()
+
+    def stop(self):
+        if self._stopping is not None:
+            self._stopping.set()
+        self._wake.set()
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'bytes_prefetched': self.bytes_prefetched,
+                    'budget': self.budget}
+
+    @staticmethod
+    def _read_list(path):
+        base = os.path.dirname(path)
+        entries = []
+        try:
+            with open(path, 'rb') as f:
+                for line in f:
+                    line = line.decode('utf-8', 'ignore').strip()
+                    if not line or line.startswith('#'):
+                        continue
+                    entries.append(os.path.join(base, line))
+        except (IOError, OSError):
+            pass
+        return entries
+
+    def loadlist(self, path, append=False):
+        self._load(self._read_list(path), append)
+
+    def loadfile(self, path, append=False):
+        self._load([path], append)
+
+    def _load(self, entries, append):
+        with self._lock:
+            self._step_pending = None
+            if append:
+                start = len(self._entries)
+                self._entries.extend(entries)
+                if self._index >= start:
+                    self._enter(start)
+            else:
+                self._entries = entries
+                self._warm = dict((p, e) for p, e in self._warm.items() if p in entries)
+                self._sizes = dict((p, s) for p, s in self._sizes.items() if p in entries)
+                self._enter(0)
+        self._wake.set()
+
+    def pt_step(self, step, force=False):
+        # pt_step n 之后 mplayer 仍只输出 EOF code: 1 或 -1，步长在此记下；
+        # 与 mplayer 一致：0 视为 1，非 force 时没有目标条目的跳转被忽略
+        step = step or 1
+        with self._lock:
+            index = self._index + step
+            if force or self.loop or 0 <= index < len(self._entries):
+                self._step_pending = step
+            else:
+                self._step_pending = None
+
+    def eof(self, code):
+        # PT_NEXT_ENTRY = 1, PT_PREV_ENTRY = -1, PT_STOP = 4；
+        # loadfile/loadlist 触发的 PT_NEXT_SRC 已在 _load 中处理
+        with self._lock:
+            if code in (1, -1):
+                step = code
+                if self._step_pending is not None:
+                    step = self._step_pending
+                    self._step_pending = None
+                index = self._index + step
+                count = len(self._entries)
+                if self.loop and count:
+                    index %= count
+                self._enter(max(0, min(index, count)))
+            elif code == 4:
+                self._enter(len(self._entries))
+            else:
+                return
+        self._wake.set()
+
+    def position(self, offset):
+        with self._lock:
+            if self._index >= len(self._entries):
+                return
+            extent = self._warm.get(self._entries[self._index])
+            # 顺序播放时的轮询不计数，只统计跳转
+            if offset < self._pos or extent is None or offset >= extent[1]:
+                self._count(offset)
+            self._pos = offset
+        self._wake.set()
+
+    def feed(self, line):
+        if line.startswith('EOF code:'):
+            try:
+                code = int(line.partition(':')[2].strip())
+            except ValueError:
+                return
+            self.eof(code)
+
+    def _enter(self, index):
+        self._index = index
+        self._pos = 0
+        if index < len(self._entries):
+            self._count(0)
+
+    def _count(self, offset):
+        extent = self._warm.get(self._entries[self._index])
+        if extent is not None and extent[0] <= offset < extent[1]:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def _size(self, path):
+        with self._lock:
+            size = self._sizes.get(path)
+        if size is None:
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                return None
+            with self._lock:
+                self._sizes[path] = size
+        return size
+
+    def _thread_func(self, stopping):
+        while not stopping.is_set():
+            while not stopping.is_set() and self._step():
+                pass
+            self._wake.wait()
+            self._wake.clear()
+
+    def _step(self):
+        with self._lock:
+            paths = self._entries[self._index:self._index + self.files + 1]
+            pos = self._pos
+            warm = dict(self._warm)
+
+        budget = self.budget
+        wanted = set()
+        job = None
+        for i, path in enumerate(paths):
+            if budget <= 0:
+                break
+            size = self._size(path)
+            if size is None:
+                continue
+            start = pos if i == 0 else 0
+            limit = min(size, start + min(self.ahead if i == 0 else self.head, budget))
+            if limit <= start:
+                continue
+            budget -= limit - start
+            wanted.add(path)
+            if job is not None:
+                continue
+            s, e = warm.get(path, (start, start))
+            if not s <= start <= e:
+                e = start
+            # 当前文件只在剩余预读量不足 ahead - chunk 时补充整块
+            if e < limit and (i > 0 or limit == size or limit - e >= self.chunk):
+                job = (path, e, min(limit if i > 0 else size, e + self.chunk))
+
+        with self._lock:
+            for path in list(self._warm):
+                if path not in wanted:
+                    del self._warm[path]
+
+        if job is None:
+            return False
+        path, start, end = job
+        try:
+            self._prefetch(path, start, end)
+        except (IOError, OSError, ValueError):
+            return False
+
+        with self._lock:
+            self.bytes_prefetched += end - start
+            s, e = self._warm.get(path, (start, start))
+            if s <= start <= e:
+                self._warm[path] = (s, max(e, end))
+            else:
+                self._warm[path] = (start, end)
+        return True
+
+    def _prefetch(self, path, start, end):
+        if hasattr(os, 'posix_fadvise'):
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, start, end - start, os.POSIX_FADV_WILLNEED)
+            finally:
+                os.close(fd)
+            return
+        # Windows 等无 posix_fadvise 的平台：分块读入复用的缓冲区，
+        # readinto 在 I/O 期间释放 GIL，不阻塞 Qt 主线程
+        if self._buffer is None:
+            self._buffer = memoryview(bytearray(MB))
+        with open(path, 'rb') as f:
+            f.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                n = f.readinto(self._buffer[:min(remaining, len(self._buffer))])
+                if not n:
+                    break
+                remaining -= n
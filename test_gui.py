@@ -0,0 +1,95 @@
+import io
+
+import pytest
+
+pytest.importorskip('PyQt5')
+
+import misc
+from core import Player
+from gui import QtPlayer
+
+
+@pytest.fixture
+def player(tmp_path, monkeypatch):
+    for name, args in (('loadfile', ['String', '[Integer]']),
+                       ('loadlist', ['String', '[Integer]']),
+                       ('pt_step', ['Integer', '[Integer]'])):
+        if not hasattr(Player, name):
+            monkeypatch.setattr(Player, name, Player._gen_method_func(name, args),
+                                raising=False)
+    for name in ('a', 'b', 'c'):
+        (tmp_path / name).write_bytes(b'\0' * 100)
+    (tmp_path / 'playlist').write_text(u'a\nb\nc\n')
+
+    p = QtPlayer(autospawn=False)
+    p.sent = []
+
+    def send(name, *args):
+        p.sent.append((name,) + args)
+        return True
+
+    monkeypatch.setattr(p, 'is_alive', lambda: True)
+    monkeypatch.setattr(p, '_send_command', send)
+    p.playlist = str(tmp_path / 'playlist')
+    # 绕过 QSocketNotifier，由 output() 直接按行处理 mplayer 输出
+    misc._StdoutWrapper._attach(p.stdout, io.BytesIO())
+    yield p
+    p.readahead.stop()
+
+
+def output(p, *lines):
+    p.stdout._source = io.BytesIO(''.join(line + '\n' for line in lines).encode('utf-8'))
+    for _ in lines:
+        p.stdout._process_output()
+
+
+def test_playlist_commands_are_tracked(player):
+    player.loadlist(player.playlist)
+    assert player.sent[-1][0] == 'loadlist'
+    assert player.readahead._index == 0
+    assert player.readahead.stats()['misses'] == 1
+
+    player.pt_step(-1)
+    output(player, 'EOF code: 1')
+    assert player.readahead._index == 1
+
+    player.pt_step(0)
+    output(player, 'EOF code: 1')
+    assert player.readahead._index == 2
+
+
+def test_poll_position(player, monkeypatch):
+    positions = []
+    monkeypatch.setattr(player.readahead, 'position', positions.append)
+    player.loadlist(player.playlist)
+
+    player.poll_position()
+    player.poll_position()
+    assert player.sent.count(('get_property', 'stream_pos')) == 1
+    output(player, 'ANS_volume=60', 'ANS_stream_pos=42')
+    assert positions == [42]
+    assert player.stdout._answers.get_nowait() == 'ANS_volume=60'
+
+    for ans in ('ANS_ERROR=PROPERTY_UNAVAILABLE', "ANS_stream_pos='(null)'"):
+        player.poll_position()
+        output(player, ans)
+    assert positions == [42]
+    assert player.stdout._expected == []
+
+
+def test_lost_position_answer_expires(player):
+    player.poll_position()
+    for _ in range(QtPlayer.position_timeout):
+        player.poll_position()
+    assert player.sent.count(('get_property', 'stream_pos')) == 2
+    assert len(player.stdout._expected) == 1
+
+
+def test_spawn_restarts_readahead(player, monkeypatch):
+    monkeypatch.setattr(Player, 'spawn', lambda self: None)
+    player.spawn()
+    first = player.readahead._stopping
+    player.readahead.stop()
+    player.spawn()
+    assert first.is_set()
+    assert not player.readahead._stopping.is_set()
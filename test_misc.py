@@ -0,0 +1,71 @@
+import io
+
+import misc
+
+
+def attach(*lines):
+    w = misc._StdoutWrapper(handle=None)
+    w._attach(io.BytesIO(''.join(line + '\n' for line in lines).encode('utf-8')))
+    return w
+
+
+def drain(w):
+    return [w._answers.get_nowait() for _ in range(w._answers.qsize())]
+
+
+def test_unexpected_answers_go_to_queue():
+    w = attach('ANS_volume=60')
+    w._process_output()
+    assert drain(w) == ['ANS_volume=60']
+
+
+def test_answer_routed_to_callback():
+    got = []
+    w = attach('ANS_volume=60', 'ANS_stream_pos=1234')
+    w._expect('stream_pos', got.append)
+    w._process_output()
+    w._process_output()
+    assert got == ['1234']
+    assert drain(w) == ['ANS_volume=60']
+    assert w._expected == []
+
+
+def test_error_belongs_to_oldest_request():
+    got = []
+    w = attach('ANS_ERROR=PROPERTY_UNAVAILABLE', 'ANS_stream_pos=1234')
+    w._expect('length')
+    w._expect('stream_pos', got.append)
+    w._process_output()
+    assert drain(w) == ['ANS_ERROR=PROPERTY_UNAVAILABLE']
+    assert got == []
+    w._process_output()
+    assert got == ['1234']
+
+
+def test_error_and_null_give_none():
+    got = []
+    w = attach('ANS_ERROR=PROPERTY_UNAVAILABLE', "ANS_stream_pos='(null)'")
+    w._expect('stream_pos', got.append)
+    w._expect('stream_pos', got.append)
+    w._process_output()
+    w._process_output()
+    assert got == [None, None]
+
+
+def test_lost_answers_are_dropped():
+    got = []
+    w = attach('ANS_stream_pos=10')
+    w._expect('length')
+    w._expect('stream_pos', got.append)
+    w._process_output()
+    assert got == ['10']
+    assert w._expected == []
+
+
+def test_subscribers_do_not_see_answers():
+    lines = []
+    w = attach('ANS_volume=60', 'EOF code: 1')
+    w.connect(lines.append)
+    w._process_output()
+    w._process_output()
+    assert lines == ['EOF code: 1']
@@ -0,0 +1,180 @@
+import os
+
+import pytest
+
+from prefetch import ReadAhead
+
+
+@pytest.fixture
+def playlist(tmp_path):
+    for name, size in (('a', 1000), ('b', 500), ('c', 500), ('d', 500)):
+        (tmp_path / name).write_bytes(b'\0' * size)
+    path = tmp_path / 'playlist'
+    path.write_text(u'a\nb\n\n# comment\nc\nd\n')
+    return str(path), str(tmp_path)
+
+
+def make(files=2, head=200, ahead=400, budget=1000, **kwargs):
+    return ReadAhead(files, head, ahead, budget, chunk=100, **kwargs)
+
+
+def run(r):
+    while r._step():
+        pass
+
+
+def warm(r, base):
+    return dict((k[len(base) + 1:], v) for k, v in r._warm.items())
+
+
+def test_window_and_budget_split(playlist):
+    path, base = playlist
+    r = make(budget=700)
+    r.loadlist(path)
+    run(r)
+    # 当前文件 400，b 取 200，c 只剩 100
+    assert warm(r, base) == {'a': (0, 400), 'b': (0, 200), 'c': (0, 100)}
+    assert r.bytes_prefetched == 700
+
+
+def test_current_file_hysteresis(playlist):
+    path, base = playlist
+    r = make()
+    r.loadlist(path)
+    run(r)
+    r.position(50)
+    assert r._step() is False
+    r.position(100)
+    assert r._step() is True
+    assert warm(r, base)['a'] == (0, 500)
+    assert r._step() is False
+
+
+def test_tail_of_current_file(playlist):
+    path, base = playlist
+    r = make()
+    r.loadlist(path)
+    run(r)
+    r.position(350)
+    run(r)
+    assert warm(r, base)['a'] == (0, 700)
+    r.position(650)
+    run(r)
+    assert warm(r, base)['a'] == (0, 1000)
+
+
+def test_seek_back_replaces_extent(playlist):
+    path, base = playlist
+    r = make()
+    r.loadlist(path)
+    run(r)
+    r.position(600)
+    run(r)
+    assert warm(r, base)['a'] == (600, 1000)
+    r.position(100)
+    run(r)
+    assert warm(r, base)['a'] == (100, 500)
+
+
+def test_eof_prunes_extents(playlist):
+    path, base = playlist
+    r = make()
+    r.loadlist(path)
+    run(r)
+    r.feed('EOF code: 1')
+    run(r)
+    assert sorted(warm(r, base)) == ['b', 'c', 'd']
+
+
+def test_hits_and_misses(playlist):
+    path, base = playlist
+    r = make()
+    r.loadlist(path)
+    assert (r.hits, r.misses) == (0, 1)
+    run(r)
+    for offset in (10, 20, 30, 40, 50):
+        r.position(offset)
+    assert (r.hits, r.misses) == (0, 1)
+    r.position(5)
+    assert (r.hits, r.misses) == (1, 1)
+    r.position(900)
+    assert (r.hits, r.misses) == (1, 2)
+    r.feed('EOF code: 1')
+    assert (r.hits, r.misses) == (2, 2)
+
+
+def test_reload_keeps_extents(playlist):
+    path, base = playlist
+    r = make()
+    r.loadlist(path)
+    run(r)
+    prefetched = r.bytes_prefetched
+    r.loadlist(path)
+    assert r.hits == 1
+    run(r)
+    assert r.bytes_prefetched == prefetched
+
+
+def test_pt_step_and_loop(playlist):
+    path, base = playlist
+    r = make(loop=True)
+    r.loadlist(path)
+    r.pt_step(2)
+    r.feed('EOF code: 1')
+    assert r._index == 2
+    r.feed('EOF code: 1')
+    r.feed('EOF code: 1')
+    assert r._index == 0
+
+
+def test_pt_step_without_target_is_ignored(playlist):
+    path, base = playlist
+    r = make()
+    r.loadlist(path)
+    r.pt_step(-1)
+    r.feed('EOF code: 1')
+    assert r._index == 1
+    r.pt_step(10)
+    r.feed('EOF code: 1')
+    assert r._index == 2
+
+
+def test_pt_step_zero_is_one(playlist):
+    path, base = playlist
+    r = make()
+    r.loadlist(path)
+    r.pt_step(0)
+    r.feed('EOF code: 1')
+    assert r._index == 1
+
+
+def test_forced_pt_step_past_end(playlist):
+    path, base = playlist
+    r = make()
+    r.loadlist(path)
+    r.pt_step(10, force=True)
+    r.feed('EOF code: 1')
+    assert r._index == 4
+    r.position(10)
+    assert r._step() is False
+
+
+def test_read_fallback(playlist, monkeypatch):
+    path, base = playlist
+    monkeypatch.delattr(os, 'posix_fadvise', raising=False)
+    r = make()
+    r.loadlist(path)
+    run(r)
+    assert warm(r, base) == {'a': (0, 400), 'b': (0, 200), 'c': (0, 200)}
+    assert r.bytes_prefetched == 800
+
+
+def test_restart_uses_new_stop_event():
+    r = make()
+    r.start()
+    first = r._stopping
+    r.stop()
+    r.start()
+    assert first.is_set()
+    assert not r._stopping.is_set()
+    r.stop()